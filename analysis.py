@@ -5,23 +5,55 @@ Performs key calculations and generates insights for Power BI
 
 import pandas as pd
 import numpy as np
+import json
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
-def load_cleaned_data(file_path='cleaned_ecommerce_data.csv'):
+# Columns read by the analysis functions; the rest of the cleaned file is never scanned
+ANALYSIS_COLUMNS = [
+    'OrderID', 'ProductID', 'ProductName', 'Category', 'CustomerID', 'Region',
+    'Quantity', 'Revenue', 'TotalSales', 'Profit', 'Year', 'Quarter', 'YearMonth'
+]
+
+CATEGORICAL_COLUMNS = ['Category', 'Region', 'ProductID', 'ProductName', 'CustomerID']
+
+def load_cleaned_data(file_path='cleaned_ecommerce_data.parquet'):
     """
     Load cleaned e-commerce data
     
     Parameters:
-    file_path (str): Path to cleaned data CSV file
+    file_path (str): Path to cleaned data Parquet file
     
     Returns:
     pd.DataFrame: Loaded dataset
     """
     print(f"Loading cleaned data from {file_path}...")
-    df = pd.read_csv(file_path, parse_dates=['OrderDate'])
+    # Low-cardinality keys are decoded straight into categoricals, so groupbys
+    # hash integer codes and the strings are never materialized per row
+    df = pd.read_parquet(file_path, columns=ANALYSIS_COLUMNS, read_dictionary=CATEGORICAL_COLUMNS)
+    
+    # Parquet dictionaries keep first-seen order; sort them so groups come out in key order
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].cat.reorder_categories(df[col].cat.categories.sort_values())
+    
     print(f"Loaded {len(df)} records")
     return df
 
+def count_distinct(df, keys, column):
+    """
+    Count distinct non-null values of a column per group, matching nunique
+    
+    Parameters:
+    df (pd.DataFrame): E-commerce dataset
+    keys (list): Columns to group by
+    column (str): Column whose distinct values are counted
+    
+    Returns:
+    pd.Series: Distinct counts indexed by the group keys
+    """
+    # count() skips the null row drop_duplicates keeps, while still reporting all-null groups as 0
+    return df[keys + [column]].drop_duplicates().groupby(keys, observed=True)[column].count()
+
 def calculate_total_sales_revenue(df):
     """
     Calculate total sales and revenue metrics
@@ -36,11 +68,14 @@ def calculate_total_sales_revenue(df):
     print("TOTAL SALES AND REVENUE ANALYSIS")
     print("="*60)
     
-    total_revenue = df['Revenue'].sum()
-    total_sales = df['TotalSales'].sum()
-    total_profit = df['Profit'].sum()
-    total_orders = df['OrderID'].nunique()
-    total_products_sold = df['Quantity'].sum()
+    # One reduction over the numeric blocks instead of four separate column scans
+    totals = df[['Revenue', 'TotalSales', 'Profit', 'Quantity']].sum()
+    total_revenue = totals['Revenue']
+    total_sales = totals['TotalSales']
+    total_profit = totals['Profit']
+    total_orders = int(df['OrderID'].nunique())
+    total_customers = int(df['CustomerID'].nunique())
+    total_products_sold = totals['Quantity']
     average_order_value = total_revenue / total_orders if total_orders > 0 else 0
     
     results = {
@@ -48,6 +83,7 @@ def calculate_total_sales_revenue(df):
         'Total Sales': round(total_sales, 2),
         'Total Profit': round(total_profit, 2),
         'Total Orders': total_orders,
+        'Total Customers': total_customers,
         'Total Products Sold': int(total_products_sold),
         'Average Order Value': round(average_order_value, 2)
     }
@@ -72,23 +108,23 @@ def find_best_selling_products(df, top_n=10):
     print(f"BEST-SELLING PRODUCTS (TOP {top_n})")
     print("="*60)
     
-    # Top products by quantity sold
-    top_by_quantity = df.groupby(['ProductID', 'ProductName', 'Category']).agg({
+    # Aggregate once per product, then rank the same totals two ways
+    product_keys = ['ProductID', 'ProductName', 'Category']
+    product_totals = df.groupby(product_keys, observed=True).agg({
         'Quantity': 'sum',
-        'Revenue': 'sum',
-        'OrderID': 'nunique'
-    }).reset_index()
-    top_by_quantity.columns = ['ProductID', 'ProductName', 'Category', 'TotalQuantity', 'TotalRevenue', 'OrderCount']
-    top_by_quantity = top_by_quantity.sort_values('TotalQuantity', ascending=False).head(top_n)
+        'Revenue': 'sum'
+    })
+    product_totals.columns = ['TotalQuantity', 'TotalRevenue']
+    product_totals['OrderCount'] = count_distinct(df, product_keys, 'OrderID')
+    product_totals = product_totals.reset_index()
+    
+    # Top products by quantity sold
+    top_by_quantity = product_totals.nlargest(top_n, 'TotalQuantity')
     
     # Top products by revenue
-    top_by_revenue = df.groupby(['ProductID', 'ProductName', 'Category']).agg({
-        'Revenue': 'sum',
-        'Quantity': 'sum',
-        'OrderID': 'nunique'
-    }).reset_index()
-    top_by_revenue.columns = ['ProductID', 'ProductName', 'Category', 'TotalRevenue', 'TotalQuantity', 'OrderCount']
-    top_by_revenue = top_by_revenue.sort_values('TotalRevenue', ascending=False).head(top_n)
+    top_by_revenue = product_totals.nlargest(top_n, 'TotalRevenue')[
+        ['ProductID', 'ProductName', 'Category', 'TotalRevenue', 'TotalQuantity', 'OrderCount']
+    ]
     
     print("\nTop Products by Quantity Sold:")
     print(top_by_quantity[['ProductName', 'Category', 'TotalQuantity', 'TotalRevenue']].to_string(index=False))
@@ -112,14 +148,15 @@ def analyze_high_revenue_categories(df):
     print("HIGH-REVENUE CATEGORIES")
     print("="*60)
     
-    category_analysis = df.groupby('Category').agg({
+    category_analysis = df.groupby('Category', observed=True).agg({
         'Revenue': ['sum', 'mean'],
         'Quantity': 'sum',
-        'OrderID': 'nunique',
         'Profit': 'sum'
-    }).reset_index()
+    })
     
-    category_analysis.columns = ['Category', 'TotalRevenue', 'AvgRevenue', 'TotalQuantity', 'OrderCount', 'TotalProfit']
+    category_analysis.columns = ['TotalRevenue', 'AvgRevenue', 'TotalQuantity', 'TotalProfit']
+    category_analysis.insert(3, 'OrderCount', count_distinct(df, ['Category'], 'OrderID'))
+    category_analysis = category_analysis.reset_index()
     category_analysis['RevenuePercentage'] = (category_analysis['TotalRevenue'] / category_analysis['TotalRevenue'].sum() * 100).round(2)
     category_analysis = category_analysis.sort_values('TotalRevenue', ascending=False)
     
@@ -145,10 +182,11 @@ def analyze_sales_trends(df):
     monthly_trends = df.groupby('YearMonth').agg({
         'Revenue': 'sum',
         'Quantity': 'sum',
-        'OrderID': 'nunique',
         'Profit': 'sum'
-    }).reset_index()
-    monthly_trends.columns = ['YearMonth', 'TotalRevenue', 'TotalQuantity', 'OrderCount', 'TotalProfit']
+    })
+    monthly_trends.columns = ['TotalRevenue', 'TotalQuantity', 'TotalProfit']
+    monthly_trends.insert(2, 'OrderCount', count_distinct(df, ['YearMonth'], 'OrderID'))
+    monthly_trends = monthly_trends.reset_index()
     monthly_trends = monthly_trends.sort_values('YearMonth')
     
     print("\nMonthly Sales Trends:")
@@ -158,10 +196,11 @@ def analyze_sales_trends(df):
     quarterly_trends = df.groupby(['Year', 'Quarter']).agg({
         'Revenue': 'sum',
         'Quantity': 'sum',
-        'OrderID': 'nunique',
         'Profit': 'sum'
-    }).reset_index()
-    quarterly_trends.columns = ['Year', 'Quarter', 'TotalRevenue', 'TotalQuantity', 'OrderCount', 'TotalProfit']
+    })
+    quarterly_trends.columns = ['TotalRevenue', 'TotalQuantity', 'TotalProfit']
+    quarterly_trends.insert(2, 'OrderCount', count_distinct(df, ['Year', 'Quarter'], 'OrderID'))
+    quarterly_trends = quarterly_trends.reset_index()
     quarterly_trends['YearQuarter'] = quarterly_trends['Year'].astype(str) + '-Q' + quarterly_trends['Quarter'].astype(str)
     quarterly_trends = quarterly_trends.sort_values(['Year', 'Quarter'])
     
@@ -189,18 +228,14 @@ def calculate_average_order_value(df):
     overall_aov = order_totals.mean()
     
     # AOV by category
-    category_aov = df.groupby('Category').apply(
-        lambda x: x.groupby('OrderID')['Revenue'].sum().mean(),
-        include_groups=False
-    ).reset_index()
+    category_order_totals = df.groupby(['Category', 'OrderID'], observed=True)['Revenue'].sum()
+    category_aov = category_order_totals.groupby('Category', observed=True).mean().reset_index()
     category_aov.columns = ['Category', 'AverageOrderValue']
     category_aov = category_aov.sort_values('AverageOrderValue', ascending=False)
     
     # AOV by region
-    region_aov = df.groupby('Region').apply(
-        lambda x: x.groupby('OrderID')['Revenue'].sum().mean(),
-        include_groups=False
-    ).reset_index()
+    region_order_totals = df.groupby(['Region', 'OrderID'], observed=True)['Revenue'].sum()
+    region_aov = region_order_totals.groupby('Region', observed=True).mean().reset_index()
     region_aov.columns = ['Region', 'AverageOrderValue']
     region_aov = region_aov.sort_values('AverageOrderValue', ascending=False)
     
@@ -232,14 +267,15 @@ def generate_regional_analysis(df):
     print("REGIONAL ANALYSIS")
     print("="*60)
     
-    regional_analysis = df.groupby('Region').agg({
+    regional_analysis = df.groupby('Region', observed=True).agg({
         'Revenue': 'sum',
         'Quantity': 'sum',
-        'OrderID': 'nunique',
-        'CustomerID': 'nunique',
         'Profit': 'sum'
-    }).reset_index()
-    regional_analysis.columns = ['Region', 'TotalRevenue', 'TotalQuantity', 'OrderCount', 'CustomerCount', 'TotalProfit']
+    })
+    regional_analysis.columns = ['TotalRevenue', 'TotalQuantity', 'TotalProfit']
+    regional_analysis.insert(2, 'OrderCount', count_distinct(df, ['Region'], 'OrderID'))
+    regional_analysis.insert(3, 'CustomerCount', count_distinct(df, ['Region'], 'CustomerID'))
+    regional_analysis = regional_analysis.reset_index()
     regional_analysis['RevenuePercentage'] = (regional_analysis['TotalRevenue'] / regional_analysis['TotalRevenue'].sum() * 100).round(2)
     regional_analysis = regional_analysis.sort_values('TotalRevenue', ascending=False)
     
@@ -247,13 +283,15 @@ def generate_regional_analysis(df):
     
     return regional_analysis
 
-def export_analysis_results(df, output_dir='analysis_output'):
+def export_analysis_results(results, output_dir='analysis_output', summary=None):
     """
-    Export analysis results to CSV files for Power BI
+    Export analysis results to Parquet files for Power BI and the dashboard
     
     Parameters:
-    df (pd.DataFrame): E-commerce dataset
+    results (dict): Precomputed analysis tables keyed by output file name
     output_dir (str): Directory to save analysis results
+    summary (dict): Headline metrics saved as summary.json so the dashboard
+                    does not have to rescan the cleaned data (optional)
     """
     import os
     
@@ -264,28 +302,18 @@ def export_analysis_results(df, output_dir='analysis_output'):
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
-    # Export best-selling products
-    top_by_quantity, top_by_revenue = find_best_selling_products(df, top_n=10)
-    top_by_quantity.to_csv(f'{output_dir}/top_products_by_quantity.csv', index=False)
-    top_by_revenue.to_csv(f'{output_dir}/top_products_by_revenue.csv', index=False)
+    # The tables are independent, so write them concurrently
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(table.to_parquet, f'{output_dir}/{name}.parquet', index=False)
+            for name, table in results.items()
+        ]
+        for future in futures:
+            future.result()
     
-    # Export category analysis
-    category_analysis = analyze_high_revenue_categories(df)
-    category_analysis.to_csv(f'{output_dir}/category_analysis.csv', index=False)
-    
-    # Export sales trends
-    monthly_trends, quarterly_trends = analyze_sales_trends(df)
-    monthly_trends.to_csv(f'{output_dir}/monthly_trends.csv', index=False)
-    quarterly_trends.to_csv(f'{output_dir}/quarterly_trends.csv', index=False)
-    
-    # Export regional analysis
-    regional_analysis = generate_regional_analysis(df)
-    regional_analysis.to_csv(f'{output_dir}/regional_analysis.csv', index=False)
-    
-    # Export AOV analysis
-    aov_results = calculate_average_order_value(df)
-    aov_results['Category AOV'].to_csv(f'{output_dir}/aov_by_category.csv', index=False)
-    aov_results['Region AOV'].to_csv(f'{output_dir}/aov_by_region.csv', index=False)
+    if summary is not None:
+        with open(f'{output_dir}/summary.json', 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
     
     print(f"\nAll analysis results exported to '{output_dir}' directory")
 
@@ -302,14 +330,27 @@ def run_complete_analysis():
     
     # Run all analyses
     total_metrics = calculate_total_sales_revenue(df)
-    find_best_selling_products(df, top_n=10)
-    analyze_high_revenue_categories(df)
-    analyze_sales_trends(df)
-    calculate_average_order_value(df)
-    generate_regional_analysis(df)
-    
-    # Export results
-    export_analysis_results(df)
+    top_by_quantity, top_by_revenue = find_best_selling_products(df, top_n=10)
+    category_analysis = analyze_high_revenue_categories(df)
+    monthly_trends, quarterly_trends = analyze_sales_trends(df)
+    aov_results = calculate_average_order_value(df)
+    regional_analysis = generate_regional_analysis(df)
+    
+    # Export the results computed above instead of recomputing them
+    results = {
+        'top_products_by_quantity': top_by_quantity,
+        'top_products_by_revenue': top_by_revenue,
+        'category_analysis': category_analysis,
+        'monthly_trends': monthly_trends,
+        'quarterly_trends': quarterly_trends,
+        'regional_analysis': regional_analysis,
+        'aov_by_category': aov_results['Category AOV'],
+        'aov_by_region': aov_results['Region AOV']
+    }
+    summary_keys = ('Total Revenue', 'Total Profit', 'Total Products Sold',
+                    'Total Orders', 'Total Customers', 'Average Order Value')
+    summary = {key: total_metrics[key] for key in summary_keys}
+    export_analysis_results(results, summary=summary)
     
     print("\n" + "="*60)
     print("ANALYSIS COMPLETE!")
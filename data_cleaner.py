@@ -5,22 +5,158 @@ Handles duplicates, missing values, data type conversions, and creates derived c
 
 import pandas as pd
 import numpy as np
-from datetime import datetime
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 
-def clean_ecommerce_data(input_file='raw_ecommerce_data.csv', output_file='cleaned_ecommerce_data.csv'):
+# Profit Margin (assume 20-40% profit margin based on category)
+PROFIT_MARGINS = {
+    'Electronics': 0.25,
+    'Clothing': 0.35,
+    'Home & Garden': 0.30,
+    'Books': 0.40,
+    'Sports & Outdoors': 0.30,
+    'Toys & Games': 0.35,
+    'Health & Beauty': 0.40,
+    'Automotive': 0.25,
+    'Food & Beverages': 0.20,
+    'Office Supplies': 0.30
+}
+
+STRING_COLUMNS = ['OrderID', 'ProductID', 'ProductName', 'Category', 'CustomerID', 'Region']
+
+# Fixed raw column types keep every streamed block's schema, and so its row hashes, identical
+RAW_COLUMN_TYPES = {col: pa.string() for col in STRING_COLUMNS + ['OrderDate']}
+RAW_COLUMN_TYPES.update({'Quantity': pa.float64(), 'Price': pa.float64(), 'Revenue': pa.float64()})
+
+def convert_data_types(df):
+    """
+    Convert OrderDate, numeric, and string columns to their cleaned types
+    
+    Parameters:
+    df (pd.DataFrame): Dataset with missing values already filled
+    
+    Returns:
+    pd.DataFrame: Dataset with converted column types
+    """
+    # Convert OrderDate to datetime
+    df['OrderDate'] = pd.to_datetime(df['OrderDate']).astype('datetime64[ns]')
+    
+    # Ensure numeric columns are correct types
+    df['Quantity'] = df['Quantity'].astype(int)
+    df['Price'] = df['Price'].astype(float)
+    df['Revenue'] = df['Revenue'].astype(float)
+    
+    # Store string columns as Arrow strings rather than Python objects
+    for col in STRING_COLUMNS:
+        df[col] = df[col].astype('string[pyarrow]')
+    
+    return df
+
+def add_derived_columns(df):
+    """
+    Add sales, profit, date component, and recency columns
+    
+    Parameters:
+    df (pd.DataFrame): Dataset with converted column types
+    
+    Returns:
+    pd.DataFrame: Dataset with derived columns
+    """
+    # Total Sales (same as Revenue, but kept for clarity)
+    df['TotalSales'] = df['Revenue']
+    
+    # Gather margins by category code rather than hashing every row's string;
+    # the trailing NaN is picked up by code -1 (missing Category)
+    categories = df['Category'].astype('category').cat
+    margin_lookup = np.array([PROFIT_MARGINS.get(c, np.nan) for c in categories.categories] + [np.nan], dtype=np.float64)
+    df['ProfitMargin'] = margin_lookup[categories.codes.to_numpy()]
+    df['Profit'] = df['Revenue'].to_numpy() * df['ProfitMargin'].to_numpy()
+    
+    # Extract date components for time-based analysis
+    df['Year'] = df['OrderDate'].dt.year
+    df['Month'] = df['OrderDate'].dt.month
+    df['Quarter'] = df['OrderDate'].dt.quarter
+    df['MonthName'] = df['OrderDate'].dt.strftime('%B')
+    df['YearMonth'] = df['OrderDate'].to_numpy().astype('datetime64[M]').astype(str)
+    
+    # Calculate days since order (for recency analysis); NaT's int64 sentinel is
+    # swapped for "now" before the arithmetic and masked back to NA afterwards
+    now_ns = np.int64(pd.Timestamp.now().value)
+    order_dates = df['OrderDate'].to_numpy().astype('datetime64[ns]')
+    missing_date = np.isnat(order_dates)
+    order_ns = np.where(missing_date, now_ns, order_dates.view('int64'))
+    days = ((now_ns - order_ns) // (86_400 * 10**9)).astype('int32')
+    df['DaysSinceOrder'] = pd.arrays.IntegerArray(days, missing_date)
+    
+    return df
+
+def category_price_stats(categories, prices):
+    """
+    Compute per-category price mean and sample standard deviation
+    
+    Rows are sorted by category once and each contiguous bucket is reduced
+    with np.add.reduceat, avoiding a hash groupby. Rows without a Category
+    get code -1 and are left out of every bucket.
+    
+    Parameters:
+    categories (pd.Series): Category of each row
+    prices (np.ndarray): Price of each row
+    
+    Returns:
+    tuple: (category_codes, category_names, mean_price, std_price) where
+           category_codes index each row into the per-category arrays
+           (-1 for rows without a Category)
+    """
+    category_codes, category_names = pd.factorize(categories)
+    has_category = category_codes >= 0
+    known_codes = category_codes[has_category]
+    order = np.argsort(known_codes, kind='stable')
+    boundaries = np.searchsorted(known_codes[order], np.arange(len(category_names) + 1))
+    starts = boundaries[:-1]
+    counts = np.diff(boundaries)
+    sorted_prices = prices[has_category][order]
+    mean_price = np.add.reduceat(sorted_prices, starts) / counts
+    squared_deviations = (sorted_prices - np.repeat(mean_price, counts)) ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Sample standard deviation (ddof=1); single-row categories get NaN and keep their row
+        std_price = np.sqrt(np.add.reduceat(squared_deviations, starts) / (counts - 1))
+    return category_codes, category_names, mean_price, std_price
+
+def downcast_numeric_columns(df):
+    """
+    Downcast small-range numeric columns to cut memory traffic in later aggregations
+    
+    Parameters:
+    df (pd.DataFrame): Dataset with derived columns
+    
+    Returns:
+    pd.DataFrame: Dataset with compact numeric types
+    """
+    # Date parts are nullable so a missing OrderDate stays NA instead of failing the cast;
+    # Quantity is unbounded input, so it only narrows to int32 rather than wrapping in int16
+    return df.astype({
+        'Quantity': 'int32',
+        'Year': 'Int16',
+        'Month': 'Int8',
+        'Quarter': 'Int8',
+        'ProfitMargin': 'float32'
+    })
+
+def clean_ecommerce_data(input_file='raw_ecommerce_data.csv', output_file='cleaned_ecommerce_data.parquet'):
     """
     Clean and preprocess e-commerce data
     
     Parameters:
     input_file (str): Path to raw data CSV file
-    output_file (str): Path to save cleaned data CSV file
+    output_file (str): Path to save cleaned data Parquet file
     
     Returns:
     pd.DataFrame: Cleaned dataset
     """
     
     print("Loading raw data...")
-    df = pd.read_csv(input_file)
+    df = pd.read_csv(input_file, engine='pyarrow')
     
     print(f"Initial records: {len(df)}")
     print(f"Initial columns: {list(df.columns)}")
@@ -36,26 +172,23 @@ def clean_ecommerce_data(input_file='raw_ecommerce_data.csv', output_file='clean
     # Step 2: Handle missing values
     print("\nStep 2: Handling missing values...")
     print("Missing values before cleaning:")
-    print(df.isnull().sum())
+    missing_before = df.isnull().sum()
+    print(missing_before)
     
     # Fill missing Price with median price for that category
-    if df['Price'].isnull().any():
-        category_medians = df.groupby('Category')['Price'].median()
-        df['Price'] = df.apply(
-            lambda row: category_medians[row['Category']] if pd.isnull(row['Price']) else row['Price'],
-            axis=1
-        )
-        print(f"Filled {df['Price'].isnull().sum()} missing prices with category medians")
+    # (guarded by the count above since the groupby is the only costly fill)
+    if missing_before['Price'] > 0:
+        category_medians = df.groupby('Category')['Price'].transform('median')
+        df['Price'] = df['Price'].fillna(category_medians)
+    print(f"Filled {missing_before['Price']} missing prices with category medians")
     
     # Fill missing Quantity with 1 (minimum order quantity)
-    if df['Quantity'].isnull().any():
-        df['Quantity'] = df['Quantity'].fillna(1)
-        print(f"Filled {df['Quantity'].isnull().sum()} missing quantities with 1")
+    df['Quantity'] = df['Quantity'].fillna(1)
+    print(f"Filled {missing_before['Quantity']} missing quantities with 1")
     
     # Fill missing Region with 'Unknown'
-    if df['Region'].isnull().any():
-        df['Region'] = df['Region'].fillna('Unknown')
-        print(f"Filled {df['Region'].isnull().sum()} missing regions with 'Unknown'")
+    df['Region'] = df['Region'].fillna('Unknown')
+    print(f"Filled {missing_before['Region']} missing regions with 'Unknown'")
     
     # Recalculate Revenue if Price or Quantity were missing
     df['Revenue'] = df['Price'] * df['Quantity']
@@ -65,59 +198,17 @@ def clean_ecommerce_data(input_file='raw_ecommerce_data.csv', output_file='clean
     
     # Step 3: Convert data types
     print("\nStep 3: Converting data types...")
-    
-    # Convert OrderDate to datetime
-    df['OrderDate'] = pd.to_datetime(df['OrderDate'])
+    df = convert_data_types(df)
     print("Converted OrderDate to datetime")
-    
-    # Ensure numeric columns are correct types
-    df['Quantity'] = df['Quantity'].astype(int)
-    df['Price'] = df['Price'].astype(float)
-    df['Revenue'] = df['Revenue'].astype(float)
     print("Converted Quantity, Price, and Revenue to appropriate numeric types")
-    
-    # Ensure string columns are object type
-    string_columns = ['OrderID', 'ProductID', 'ProductName', 'Category', 'CustomerID', 'Region']
-    for col in string_columns:
-        df[col] = df[col].astype(str)
-    print("Converted string columns to object type")
+    print("Converted string columns to Arrow-backed string type")
     
     # Step 4: Create derived columns
     print("\nStep 4: Creating derived columns...")
-    
-    # Total Sales (same as Revenue, but kept for clarity)
-    df['TotalSales'] = df['Revenue']
+    df = add_derived_columns(df)
     print("Created TotalSales column")
-    
-    # Profit Margin (assume 20-40% profit margin based on category)
-    profit_margins = {
-        'Electronics': 0.25,
-        'Clothing': 0.35,
-        'Home & Garden': 0.30,
-        'Books': 0.40,
-        'Sports & Outdoors': 0.30,
-        'Toys & Games': 0.35,
-        'Health & Beauty': 0.40,
-        'Automotive': 0.25,
-        'Food & Beverages': 0.20,
-        'Office Supplies': 0.30
-    }
-    
-    df['ProfitMargin'] = df['Category'].map(profit_margins)
-    df['Profit'] = df['Revenue'] * df['ProfitMargin']
     print("Created ProfitMargin and Profit columns")
-    
-    # Extract date components for time-based analysis
-    df['Year'] = df['OrderDate'].dt.year
-    df['Month'] = df['OrderDate'].dt.month
-    df['Quarter'] = df['OrderDate'].dt.quarter
-    df['MonthName'] = df['OrderDate'].dt.strftime('%B')
-    df['YearMonth'] = df['OrderDate'].dt.to_period('M').astype(str)
     print("Created date component columns (Year, Month, Quarter, MonthName, YearMonth)")
-    
-    # Calculate days since order (for recency analysis)
-    current_date = datetime.now()
-    df['DaysSinceOrder'] = (current_date - df['OrderDate']).dt.days
     print("Created DaysSinceOrder column")
     
     # Step 5: Data validation and outlier handling
@@ -131,19 +222,21 @@ def clean_ecommerce_data(input_file='raw_ecommerce_data.csv', output_file='clean
         print(f"Removed {removed} records with invalid values")
     
     # Remove extreme outliers (Price > 3 standard deviations from mean)
-    for category in df['Category'].unique():
-        category_data = df[df['Category'] == category]
-        mean_price = category_data['Price'].mean()
-        std_price = category_data['Price'].std()
-        upper_limit = mean_price + (3 * std_price)
-        lower_limit = mean_price - (3 * std_price)
-        
-        outliers = df[(df['Category'] == category) & 
-                     ((df['Price'] > upper_limit) | (df['Price'] < lower_limit))]
-        if len(outliers) > 0:
-            df = df[~((df['Category'] == category) & 
-                     ((df['Price'] > upper_limit) | (df['Price'] < lower_limit)))]
-            print(f"Removed {len(outliers)} price outliers from {category}")
+    prices = df['Price'].to_numpy()
+    category_codes, category_names, mean_price, std_price = category_price_stats(df['Category'], prices)
+    # Rows without a Category have no price statistics and are never outliers
+    has_category = category_codes >= 0
+    known_codes = category_codes[has_category]
+    outliers = np.zeros(len(prices), dtype=bool)
+    outliers[has_category] = np.abs(prices[has_category] - mean_price[known_codes]) > (3 * std_price[known_codes])
+    outlier_counts = np.bincount(category_codes[outliers], minlength=len(category_names))
+    for category, count in zip(category_names, outlier_counts):
+        if count > 0:
+            print(f"Removed {count} price outliers from {category}")
+    df = df[~outliers]
+    
+    df = downcast_numeric_columns(df)
+    print("Downcast Quantity, Year, Month, Quarter, and ProfitMargin to compact numeric types")
     
     # Step 6: Final data summary
     print("\n" + "="*50)
@@ -160,15 +253,155 @@ def clean_ecommerce_data(input_file='raw_ecommerce_data.csv', output_file='clean
     
     # Step 7: Save cleaned data
     print(f"\nSaving cleaned data to {output_file}...")
-    df.to_csv(output_file, index=False)
+    df.to_parquet(output_file, index=False)
     print("Data cleaning completed successfully!")
     
     return df
 
+def mark_first_occurrences(chunk, seen_runs):
+    """
+    Flag rows not seen earlier in this chunk or in any previous chunk
+    
+    Rows are compared by their 64-bit hash, so two distinct rows whose hashes
+    collide would be treated as duplicates and the later one dropped.
+    
+    Seen hashes are kept as sorted uint64 runs of decreasing size. A new run is
+    merged into the runs no larger than itself, so each hash is re-merged only
+    O(log rows) times and membership is checked against O(log rows) runs.
+    
+    Parameters:
+    chunk (pd.DataFrame): Raw data chunk
+    seen_runs (list): Sorted uint64 hash runs of earlier chunks; updated in place
+    
+    Returns:
+    np.ndarray: Boolean mask of rows to keep
+    """
+    row_hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+    keep = ~pd.Series(row_hashes).duplicated().to_numpy()
+    for run in seen_runs:
+        positions = np.minimum(np.searchsorted(run, row_hashes), len(run) - 1)
+        keep &= run[positions] != row_hashes
+    
+    new_run = np.sort(row_hashes[keep])
+    while seen_runs and len(seen_runs[-1]) <= len(new_run):
+        # Stable sort detects the two presorted halves and merges them in linear time
+        new_run = np.sort(np.concatenate([seen_runs.pop(), new_run]), kind='stable')
+    if len(new_run):
+        seen_runs.append(new_run)
+    return keep
+
+def read_csv_chunks(input_file, block_size):
+    """
+    Stream a raw CSV as DataFrame chunks using pyarrow's multi-threaded CSV reader
+    
+    Parameters:
+    input_file (str): Path to raw data CSV file
+    block_size (int): Number of bytes parsed per chunk
+    
+    Returns:
+    generator: DataFrame per parsed block
+    """
+    reader = pacsv.open_csv(
+        input_file,
+        read_options=pacsv.ReadOptions(block_size=block_size, use_threads=True),
+        convert_options=pacsv.ConvertOptions(column_types=RAW_COLUMN_TYPES, strings_can_be_null=True)
+    )
+    for batch in reader:
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+def clean_ecommerce_data_chunked(input_file='raw_ecommerce_data.csv', output_file='cleaned_ecommerce_data.parquet',
+                                 block_size=1 << 24):
+    """
+    Clean e-commerce data in fixed-size chunks instead of loading the raw file whole
+    
+    Produces the same rows as clean_ecommerce_data. A first pass over the file
+    keeps only Category, Price, and Quantity of deduplicated rows to compute the
+    category price medians and outlier limits; a second pass cleans each chunk
+    with those global statistics and appends it to the Parquet file as a row group.
+    
+    Only the full-width frames are bounded by the chunk size. Memory still grows
+    with the row count: deduplication keeps an 8-byte hash per distinct row, and
+    the first pass holds the three price columns of every distinct row.
+    
+    Parameters:
+    input_file (str): Path to raw data CSV file
+    output_file (str): Path to save cleaned data Parquet file
+    block_size (int): Number of raw CSV bytes parsed per chunk
+    
+    Returns:
+    int: Number of cleaned records written
+    """
+    # Pass 1: global statistics from the deduplicated price columns
+    print("Pass 1: Computing category price statistics...")
+    seen_runs = []
+    price_parts = []
+    for chunk in read_csv_chunks(input_file, block_size):
+        keep = mark_first_occurrences(chunk, seen_runs)
+        price_parts.append(chunk.loc[keep, ['Category', 'Price', 'Quantity']])
+    
+    if not price_parts:
+        # Header-only input has no chunks to stream; the in-memory path writes the empty file
+        print("No records found in input file")
+        return len(clean_ecommerce_data(input_file, output_file))
+    
+    prices = pd.concat(price_parts, ignore_index=True)
+    del price_parts
+    
+    category_medians = prices.groupby('Category')['Price'].median()
+    prices['Price'] = prices['Price'].fillna(prices['Category'].map(category_medians))
+    prices['Quantity'] = prices['Quantity'].fillna(1)
+    valid = (
+        (prices['Price'] > 0)
+        & (prices['Quantity'].astype(int) > 0)
+        & (prices['Price'] * prices['Quantity'] > 0)
+    )
+    prices = prices[valid]
+    _, category_names, mean_price, std_price = category_price_stats(prices['Category'], prices['Price'].to_numpy())
+    mean_by_category = pd.Series(mean_price, index=category_names)
+    std_by_category = pd.Series(std_price, index=category_names)
+    print(f"Computed statistics for {len(category_names)} categories from {len(prices)} records")
+    del prices
+    
+    # Pass 2: clean each chunk with the global statistics and stream it to Parquet
+    print("Pass 2: Cleaning and writing chunks...")
+    seen_runs = []
+    writer = None
+    total_records = 0
+    try:
+        for chunk in read_csv_chunks(input_file, block_size):
+            chunk = chunk[mark_first_occurrences(chunk, seen_runs)].copy()
+    
+            chunk['Price'] = chunk['Price'].fillna(chunk['Category'].map(category_medians))
+            chunk['Quantity'] = chunk['Quantity'].fillna(1)
+            chunk['Region'] = chunk['Region'].fillna('Unknown')
+            chunk['Revenue'] = chunk['Price'] * chunk['Quantity']
+    
+            chunk = convert_data_types(chunk)
+            chunk = add_derived_columns(chunk)
+    
+            chunk = chunk[(chunk['Price'] > 0) & (chunk['Quantity'] > 0) & (chunk['Revenue'] > 0)]
+            chunk_mean = chunk['Category'].map(mean_by_category)
+            chunk_std = chunk['Category'].map(std_by_category)
+            chunk = chunk[~((chunk['Price'] - chunk_mean).abs() > 3 * chunk_std)]
+            chunk = downcast_numeric_columns(chunk)
+    
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(output_file, table.schema)
+            writer.write_table(table)
+            total_records += len(chunk)
+            print(f"Wrote {total_records} cleaned records...")
+    finally:
+        if writer is not None:
+            writer.close()
+    
+    print(f"Data cleaning completed successfully! {total_records} records saved to {output_file}")
+    return total_records
+
 if __name__ == '__main__':
     # Clean the data
     cleaned_df = clean_ecommerce_data()
     
     print("\nFirst few rows of cleaned data:")
     print(cleaned_df.head(10))
-
@@ -55,79 +55,85 @@ def generate_ecommerce_data(num_records=1000):
     # Regions
     regions = ['North America', 'Europe', 'Asia Pacific', 'South America', 'Middle East', 'Africa']
     
-    # Generate data
-    data = []
+    # Realistic price range per category
+    base_prices = {
+        'Electronics': (50, 2000),
+        'Clothing': (10, 200),
+        'Home & Garden': (15, 500),
+        'Books': (5, 50),
+        'Sports & Outdoors': (20, 800),
+        'Toys & Games': (5, 150),
+        'Health & Beauty': (3, 100),
+        'Automotive': (10, 300),
+        'Food & Beverages': (2, 50),
+        'Office Supplies': (1, 100)
+    }
+    
+    # Lookup tables indexed by category code
+    min_prices = np.array([base_prices[c][0] for c in categories], dtype=float)
+    max_prices = np.array([base_prices[c][1] for c in categories], dtype=float)
+    product_counts = np.array([len(products[c]) for c in categories])
+    product_offsets = np.concatenate(([0], np.cumsum(product_counts)[:-1]))
+    product_names = np.array([p for c in categories for p in products[c]])
+    product_id_lookup = np.array([f'PROD{str(hash(p + c) % 10000).zfill(5)}' for c in categories for p in products[c]])
     
     # Date range: last 2 years
     start_date = datetime.now() - timedelta(days=730)
     
-    for i in range(num_records):
-        # Generate OrderID
-        order_id = f'ORD{str(i+1).zfill(6)}'
-        
-        # Select random category
-        category = np.random.choice(categories)
-        
-        # Select random product from category
-        product_name = np.random.choice(products[category])
-        
-        # Generate ProductID
-        product_id = f'PROD{str(hash(product_name + category) % 10000).zfill(5)}'
-        
-        # Generate realistic price based on category
-        base_prices = {
-            'Electronics': (50, 2000),
-            'Clothing': (10, 200),
-            'Home & Garden': (15, 500),
-            'Books': (5, 50),
-            'Sports & Outdoors': (20, 800),
-            'Toys & Games': (5, 150),
-            'Health & Beauty': (3, 100),
-            'Automotive': (10, 300),
-            'Food & Beverages': (2, 50),
-            'Office Supplies': (1, 100)
-        }
-        
-        min_price, max_price = base_prices[category]
-        price = round(np.random.uniform(min_price, max_price), 2)
-        
-        # Generate quantity (1-10 items per order)
-        quantity = np.random.randint(1, 11)
-        
-        # Calculate revenue
-        revenue = round(price * quantity, 2)
-        
-        # Generate random order date within last 2 years
-        days_offset = np.random.randint(0, 730)
-        order_date = start_date + timedelta(days=days_offset)
-        
-        # Generate CustomerID
-        customer_id = f'CUST{str(np.random.randint(1, 501)).zfill(4)}'
-        
-        # Select random region
-        region = np.random.choice(regions)
-        
-        data.append({
-            'OrderID': order_id,
-            'ProductID': product_id,
-            'ProductName': product_name,
-            'Category': category,
-            'Quantity': quantity,
-            'Price': price,
-            'Revenue': revenue,
-            'OrderDate': order_date,
-            'CustomerID': customer_id,
-            'Region': region
-        })
-    
-    # Create DataFrame
-    df = pd.DataFrame(data)
+    # Generate OrderIDs
+    order_ids = np.char.add('ORD', np.char.zfill(np.arange(1, num_records + 1).astype(str), 6))
+    
+    # Select random category for every order
+    category_codes = np.random.randint(0, len(categories), num_records)
+    
+    # Select random product from each order's category
+    product_codes = product_offsets[category_codes] + (
+        np.random.random(num_records) * product_counts[category_codes]
+    ).astype(int)
+    order_products = product_names[product_codes]
+    
+    # Generate ProductIDs
+    product_ids = product_id_lookup[product_codes]
+    
+    # Generate realistic prices based on category
+    prices = np.random.uniform(min_prices[category_codes], max_prices[category_codes]).round(2)
+    
+    # Generate quantity (1-10 items per order)
+    quantities = np.random.randint(1, 11, num_records, dtype=np.int8)
+    
+    # Calculate revenue
+    revenues = (prices * quantities).round(2)
+    
+    # Generate random order dates within last 2 years
+    days_offset = np.random.randint(0, 730, num_records)
+    order_dates = start_date + pd.to_timedelta(days_offset, unit='D')
+    
+    # Generate CustomerIDs
+    customer_ids = np.char.add('CUST', np.char.zfill(np.random.randint(1, 501, num_records).astype(str), 4))
+    
+    # Select random region
+    region_codes = np.random.randint(0, len(regions), num_records)
+    
+    # Create DataFrame from typed columns so pandas has no dtypes to infer;
+    # Category and Region wrap the drawn codes directly as categoricals
+    df = pd.DataFrame({
+        'OrderID': order_ids,
+        'ProductID': product_ids,
+        'ProductName': order_products,
+        'Category': pd.Categorical.from_codes(category_codes, categories),
+        'Quantity': pd.array(quantities, dtype='Int8'),
+        'Price': prices,
+        'Revenue': revenues,
+        'OrderDate': order_dates,
+        'CustomerID': customer_ids,
+        'Region': pd.Categorical.from_codes(region_codes, regions)
+    })
     
     # Introduce some missing values (5% of records)
     missing_indices = np.random.choice(df.index, size=int(num_records * 0.05), replace=False)
     missing_cols = np.random.choice(['Price', 'Quantity', 'Region'], size=len(missing_indices))
-    for idx, col in zip(missing_indices, missing_cols):
-        df.loc[idx, col] = np.nan
+    for col in ['Price', 'Quantity', 'Region']:
+        df.loc[missing_indices[missing_cols == col], col] = np.nan
     
     # Introduce some duplicates (2% of records)
     duplicate_indices = np.random.choice(df.index, size=int(num_records * 0.02), replace=False)
@@ -49,9 +49,10 @@ if errorlevel 1 (
 echo.
 echo Pipeline completed successfully!
 echo - raw_ecommerce_data.csv
-echo - cleaned_ecommerce_data.csv
-echo - analysis_output\*.csv
+echo - cleaned_ecommerce_data.parquet
+echo - analysis_output\*.parquet
 echo - dashboard.html
+echo - dashboard.html.gz
 
 echo.
 echo Opening dashboard...